@@ -92,8 +92,7 @@ def getResourceDirs():
     
     # Create tooldir if necessary
     toolDir = os.path.join(appDataDir, 'tools')
-    if not os.path.isdir(toolDir):
-        os.mkdir(toolDir)
+    os.makedirs(toolDir, exist_ok=True)
     
     return iepDir, appDataDir
 
@@ -103,14 +102,11 @@ def resetConfig(preserveState=True):
     Replaces the config fyle with the default and prevent IEP from storing
     its config on the next shutdown.
     """ 
-    # Get filenames
-    configFileName1 = os.path.join(iepDir, 'resources', 'defaultConfig.ssdf')
-    configFileName2 = os.path.join(appDataDir, 'config.ssdf')        
     # Read, edit, write
-    tmp = ssdf.load(configFileName1)
+    tmp = ssdf.load(_defaultConfigFile)
     if preserveState:
         tmp.state = config.state
-    ssdf.save(configFileName2, tmp)    
+    ssdf.save(_userConfigFile, tmp)    
     global _saveConfigFile
     _saveConfigFile = False
     print("Replaced config file. Restart IEP to revert to the default config.")
@@ -124,18 +120,23 @@ def loadConfig(defaultsOnly=False):
     
     # Function to insert names from one config in another
     def replaceFields(base, new):
-        for key in new:
-            if key in base and isinstance(base[key], ssdf.Struct):                
-                replaceFields(base[key], new[key])
-            else:
-                base[key] = new[key]
+        Struct = ssdf.Struct
+        todo = [(base, new)]
+        while todo:
+            base, new = todo.pop()
+            for key in new:
+                value = new[key]
+                if ( key in base and isinstance(base[key], Struct) and 
+                                     isinstance(value, Struct) ):
+                    todo.append((base[key], value))
+                else:
+                    base[key] = value
     
     # Reset our iep.config structure
     ssdf.clear(config)
     
     # Load default and inject in the iep.config
-    fname = os.path.join(iepDir, 'resources', 'defaultConfig.ssdf')
-    defaultConfig = ssdf.load(fname)
+    defaultConfig = ssdf.load(_defaultConfigFile)
     replaceFields(config, defaultConfig)
     
     # Platform specific keybinding: on Mac, Ctrl+Tab (actually Cmd+Tab) is a system shortcut
@@ -143,9 +144,8 @@ def loadConfig(defaultsOnly=False):
         config.shortcuts2.view__select_previous_file = 'Alt+Tab,'
     
     # Load user config and inject in iep.config
-    fname = os.path.join(appDataDir, "config.ssdf")
-    if os.path.isfile(fname):
-        userConfig = ssdf.load(fname)
+    if os.path.isfile(_userConfigFile):
+        userConfig = ssdf.load(_userConfigFile)
         replaceFields(config, userConfig)
 
 
@@ -162,9 +162,12 @@ def saveConfig():
     if main:
         main.saveWindowState()
     
-    # Store config
+    # Store config. Write to a temporary file first and then move it in
+    # place, so that a crash halfway does not leave a truncated config.
     if _saveConfigFile:
-        ssdf.save( os.path.join(appDataDir, "config.ssdf"), config )
+        tmpFile = _userConfigFile + '.tmp'
+        ssdf.save(tmpFile, config)
+        os.replace(tmpFile, _userConfigFile)
 
 
 
@@ -221,6 +224,10 @@ status = None # The statusbar (or None)
 # Get directories of interest
 iepDir, appDataDir = getResourceDirs()
 
+# The default config file and that of the user
+_defaultConfigFile = os.path.join(iepDir, 'resources', 'defaultConfig.ssdf')
+_userConfigFile = os.path.join(appDataDir, 'config.ssdf')
+
 # Whether the config file should be saved
 _saveConfigFile = True
 
@@ -110,6 +110,13 @@ from .highlighter import Highlighter
 from .style import StyleFormat, StyleElementDescription
 
 
+# Buffer for the style element descriptions per (editor) class
+_styleElementDescriptions = {}
+
+# Buffer for the names of the option setters per (editor) class
+_optionSetterNames = {}
+
+
 class CodeEditorBase(QtGui.QPlainTextEdit):
     """ The base code editor class. Implements some basic features required
     by the extensions.
@@ -150,12 +157,14 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
         
         # Init styles to default values
         self.__style = {}
+        # (The descriptions are shared, so use copies of the formats)
         for element in self.getStyleElementDescriptions():
-            self.__style[element.key] = element.defaultFormat
+            self.__style[element.key] = StyleFormat(element.defaultFormat)
         
         # Connext style update
         self.styleChanged.connect(self.__afterSetStyle)
         self.__styleChangedPending = False
+        self.__styleChangedPosted = False
         
         # Init options now. 
         # NOTE TO PEOPLE DEVELOPING EXTENSIONS:
@@ -233,13 +242,32 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
         methods.
         """
         
+        # The options are the same for all instances of a class, so
+        # only scan the members once per class
+        cls = self.__class__
+        if cls not in _optionSetterNames:
+            _optionSetterNames[cls] = self.__getOptionSetterNames()
+        
+        # Get the (bound) setter methods
+        setters = {}
+        for key, name_set in _optionSetterNames[cls]:
+            setters[key] = getattr(self, name_set)
+        return setters
+    
+    
+    def __getOptionSetterNames(self):
+        """ Get a tuple of (lowercase option name, setter name) tuples
+        for all options. Also sets the default value on both the setter
+        and getter.
+        """
+        
         # Get all names that can be options
         allNames = set(dir(self))
         nativeNames = set(dir(QtGui.QPlainTextEdit))
         names = allNames.difference(nativeNames)
         
-        # Init dict of setter members
-        setters = {}
+        # Init list of setter names
+        setterNames = []
         
         for name in names:
             # Get name without set
@@ -265,10 +293,10 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
             member_set.__dict__[DEFAULT_OPTION_NAME] = defaultValue
             member_get.__dict__[DEFAULT_OPTION_NAME] = defaultValue
             # Add to list
-            setters[name.lower()] = member_set
+            setterNames.append((name.lower(), name_set))
         
         # Done
-        return setters
+        return tuple(setterNames)
     
     
     def __setOptions(self, setters, options):
@@ -428,20 +456,23 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
         
         """ 
         
-        # Collect members by walking the class bases
+        # Use the buffered result if we have one for this class
+        if cls in _styleElementDescriptions:
+            return list(_styleElementDescriptions[cls])
+        
+        # Collect members by walking the class bases (depth first, in the
+        # same order as the bases are listed)
         elements = []
-        def collectElements(cls, iter=1):
+        classesToVisit = [cls]
+        while classesToVisit:
+            c = classesToVisit.pop()
             # Valid class?
-            if cls is object or cls is QtGui.QPlainTextEdit:
-                return
+            if c is object or c is QtGui.QPlainTextEdit:
+                continue
             # Check members
-            if hasattr(cls, '_styleElements'):
-                for element in cls._styleElements:
-                    elements.append(element)
-            # Recurse
-            for c in cls.__bases__:
-                collectElements(c, iter+1)
-        collectElements(cls)
+            elements.extend(getattr(c, '_styleElements', []))
+            # Visit bases next
+            classesToVisit.extend(reversed(c.__bases__))
         
         # Make style element descriptions
         # (Use a dict to ensure there are no duplicate keys)
@@ -454,10 +485,12 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
                 element = StyleElementDescription(*element)
             else:
                 print('Warning: invalid element: ' + repr(element))
+                continue
             # Store using the name as a key to prevent duplicates
             elements2[element.key] = element
         
-        # Done
+        # Buffer and done
+        _styleElementDescriptions[cls] = tuple(elements2.values())
         return list(elements2.values())
     
     
@@ -536,7 +569,7 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
         # Notify that style changed, adopt a lazy approach to make loading
         # quicker.
         if self.isVisible():
-            callLater(self.styleChanged.emit)
+            self.__postStyleChanged()
             self.__styleChangedPending = False
         else:
             self.__styleChangedPending = True
@@ -546,10 +579,27 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
         super(CodeEditorBase, self).showEvent(event)
         # Does the style need updating?
         if self.__styleChangedPending:
-            callLater(self.styleChanged.emit)
+            self.__postStyleChanged()
             self.__styleChangedPending = False
     
     
+    def __postStyleChanged(self):
+        """ __postStyleChanged()
+        
+        Emit styleChanged in the next event loop iteration. Multiple
+        calls before that happens result in a single emit.
+        
+        """
+        if not self.__styleChangedPosted:
+            self.__styleChangedPosted = True
+            callLater(self.__emitStyleChanged)
+    
+    
+    def __emitStyleChanged(self):
+        self.__styleChangedPosted = False
+        self.styleChanged.emit()
+    
+    
     def __afterSetStyle(self):
         """ _afterSetStyle()
         
@@ -561,7 +611,10 @@ class CodeEditorBase(QtGui.QPlainTextEdit):
         format = self.getStyleElementFormat('editor.text')
         ss = 'QPlainTextEdit{ color:%s; background-color:%s; }' %  (
                             format['fore'], format['back'])
-        self.setStyleSheet(ss)
+        if ss != self.styleSheet():
+            # Setting a style sheet makes Qt re-polish the widget, so only
+            # do this if it changed
+            self.setStyleSheet(ss)
         
         # Make sure the style is applied
         self.viewport().update()
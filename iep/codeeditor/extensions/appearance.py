@@ -146,14 +146,18 @@ class IndentationGuides(object):
         painter.setPen(pen)
         offset = doc.documentMargin() + self.contentOffset().x()
         
+        # Bind methods that are called for each line/guide
+        cursorRect = self.cursorRect
+        charWidth = self.fontMetrics().width
+        
         def paintIndentationGuides(cursor):
-            y3=self.cursorRect(cursor).top()
-            y4=self.cursorRect(cursor).bottom()            
+            rect = cursorRect(cursor)
+            y3, y4 = rect.top(), rect.bottom()
             
             bd = cursor.block().userData()            
             if bd and bd.indentation:
                 for x in range(indentWidth, bd.indentation * factor, indentWidth):
-                    w = self.fontMetrics().width('i'*x) + offset
+                    w = charWidth('i'*x) + offset
                     w += 1 # Put it more under the block
                     if w > 0: # if scrolled horizontally it can become < 0
                         painter.drawLine(QtCore.QLine(w, y3, w, y4))
@@ -662,8 +666,13 @@ class SyntaxHighlighting(object):
         Set the current parser by giving the parser name.
         
         """
+        # Get parser, nothing to do if it's the one we already have
+        parser = Manager.getParserByName(parserName)
+        if parser is self.parser():
+            return
+        
         # Set parser
-        self.__parser = Manager.getParserByName(parserName)
+        self.__parser = parser
 
         # Restyle, use setStyle for lazy updating
         self.setStyle()
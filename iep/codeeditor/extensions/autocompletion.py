@@ -26,14 +26,34 @@ class CompletionListModel(QtGui.QStringListModel):
 
 # todo: use keywords from the parser
 class AutoCompletion(object):
+    
+    # Model with the Python keywords, shared by all editors until they
+    # get their own list of names
+    _keywordModel = None
+    
+    # The completer (and its popup) is shared by all editors, since only
+    # one list is shown at a time. It is bound to an editor when that
+    # editor shows its autocompletion list.
+    _completer = None
+    
+    # The maximum number of recent completions to remember
+    _maxRecentCompletions = 100
+    
     def __init__(self,*args, **kwds):
         super(AutoCompletion, self).__init__(*args, **kwds)
         # Autocompleter
-        self.__completerModel = QtGui.QStringListModel(keyword.kwlist)
-        self.__completer = QtGui.QCompleter(self)
-        self.__completer.setModel(self.__completerModel)
-        self.__completer.setCaseSensitivity(Qt.CaseInsensitive)
-        self.__completer.setWidget(self)
+        if AutoCompletion._keywordModel is None:
+            AutoCompletion._keywordModel = QtGui.QStringListModel(keyword.kwlist)
+        if AutoCompletion._completer is None:
+            completer = QtGui.QCompleter()
+            completer.setModel(AutoCompletion._keywordModel)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            completer.activated.connect(AutoCompletion._onCompleterActivated)
+            completer.highlighted.connect(
+                                    AutoCompletion._onCompleterHighlighted)
+            AutoCompletion._completer = completer
+        self.__completerModel = AutoCompletion._keywordModel
+        self.__completer = AutoCompletion._completer
         self.__completerNames = []
         self.__recentCompletions = [] #List of recently selected completions
         
@@ -47,10 +67,32 @@ class AutoCompletion(object):
         
         self.__autocompletionAcceptKeys = (Qt.Key_Tab,)
         
-        #Connect signals
+        # Timer to update the popup after typing, so that a quick series
+        # of keystrokes results in a single update
+        self.__updateTimer = QtCore.QTimer(self)
+        self.__updateTimer.setSingleShot(True)
+        self.__updateTimer.setInterval(30)
+        self.__updateTimer.timeout.connect(self.__updateAutocompleterNow)
+        
         self.__highlightedCompletion = None
-        self.__completer.activated.connect(self.onAutoComplete)
-        self.__completer.highlighted.connect(self._setHighlightedCompletion)
+    
+    @staticmethod
+    def _onCompleterActivated(text):
+        """ Forward the activated signal of the shared completer to the
+        editor that it is bound to.
+        """
+        widget = AutoCompletion._completer.widget()
+        if isinstance(widget, AutoCompletion):
+            widget.onAutoComplete(text)
+    
+    @staticmethod
+    def _onCompleterHighlighted(text):
+        """ Forward the highlighted signal of the shared completer to the
+        editor that it is bound to.
+        """
+        widget = AutoCompletion._completer.widget()
+        if isinstance(widget, AutoCompletion):
+            widget._setHighlightedCompletion(text)
     
     def _setHighlightedCompletion(self, value):
         """ Keeping track of the highlighted item allows us
@@ -96,6 +138,20 @@ class AutoCompletion(object):
         cursor position minus offset. If names is given and not None, it is set
         as the list of possible completions.
         """
+        # Quick path: already showing the list from the same start, and
+        # no new names; only the prefix needs updating. A buffered list of
+        # names is passed as the same object each time.
+        if ( (names is None or names is self.__completerNames) and 
+                self.autocompleteActive() and
+                self.textCursor().position() - offset == 
+                self.__autocompleteStart.position() ):
+            self.__updateTimer.stop()
+            self.__updateAutocompleterPrefix()
+            return
+        
+        # Bind the shared completer to this editor
+        self.__bindCompleter()
+        
         #Pop-up the autocompleteList
         startcursor=self.textCursor()
         startcursor.movePosition(startcursor.Left, n=offset)
@@ -110,9 +166,8 @@ class AutoCompletion(object):
             self.__autocompleteStart.setKeepPositionOnInsert(True)
 
             #Popup the autocompleter. Don't use .complete() since we want to
-            #position the popup manually
+            #position the popup manually. The prefix is updated below.
             self.__positionAutocompleter()
-            self.__updateAutocompleterPrefix()
             self.__completer.popup().show()
             
             if self.__autocompleteDebug:
@@ -122,15 +177,26 @@ class AutoCompletion(object):
             #TODO: a more intelligent implementation that adds new items and removes
             #old ones
             if names != self.__completerNames:
-                self.__completerModel.setStringList(names)
+                if self.__completerModel is AutoCompletion._keywordModel:
+                    # Create our own model, leave the shared one alone
+                    self.__completerModel = QtGui.QStringListModel(names)
+                    self.__completer.setModel(self.__completerModel)
+                else:
+                    self.__completerModel.setStringList(names)
                 self.__completerNames = names
+        
+        # Update the prefix once, now that the start and names are known.
+        # This also takes care of any pending update after typing.
+        self.__updateTimer.stop()
         self.__updateAutocompleterPrefix()
     
     def autocompleteAccept(self):
         pass
     
     def autocompleteCancel(self):
-        self.__completer.popup().hide()
+        self.__updateTimer.stop()
+        if self.__completer.widget() is self:
+            self.__completer.popup().hide()
         self.__autocompleteStart = None
         
     def onAutoComplete(self, text=None):
@@ -143,10 +209,15 @@ class AutoCompletion(object):
         cursor.insertText(text)
         self.autocompleteCancel() #Reset the completer
         
-        #Update the recent completions list
-        if text in self.__recentCompletions:
-            self.__recentCompletions.remove(text)
-        self.__recentCompletions.append(text)
+        #Update the recent completions list. Limit its length, because it
+        #is searched on each acceptance and indexed on each prefix update.
+        #Trim in place, since the list may be shared with other editors.
+        recent = self.__recentCompletions
+        if text in recent:
+            recent.remove(text)
+        recent.append(text)
+        if len(recent) > self._maxRecentCompletions:
+            del recent[:-self._maxRecentCompletions]
         
     def autocompleteActive(self):
         """ Returns whether an autocompletion list is currently shown. 
@@ -154,16 +225,30 @@ class AutoCompletion(object):
         return self.__autocompleteStart is not None
     
     
+    def __bindCompleter(self):
+        """ Bind the shared completer to this editor, and cancel the 
+        autocompletion of the editor that it was bound to before.
+        """
+        previous = self.__completer.widget()
+        if previous is self:
+            return
+        if isinstance(previous, AutoCompletion):
+            previous.autocompleteCancel()
+        self.__completer.popup().hide()
+        self.__completer.setWidget(self)
+        self.__completer.setModel(self.__completerModel)
+    
+    
     def __positionAutocompleter(self):
         """Move the autocompleter list to a proper position"""
         #Find the start of the autocompletion and move the completer popup there
         cur=QtGui.QTextCursor(self.__autocompleteStart) #Copy __autocompleteStart
         
-        # Set size
-        geometry = self.__completer.popup().geometry()
-        geometry.setWidth(self.__popupSize[0])
-        geometry.setHeight(self.__popupSize[1])
-        self.__completer.popup().setGeometry(geometry)
+        # Set size, only if it changed (the popup is shared by all editors)
+        popup = self.__completer.popup()
+        width, height = self.__popupSize
+        if popup.width() != width or popup.height() != height:
+            popup.resize(width, height)
         
         # Initial choice for position of the completer
         position = self.cursorRect(cur).bottomLeft() + self.viewport().pos()
@@ -171,13 +256,13 @@ class AutoCompletion(object):
         # Check if the completer is going to go off the screen
         desktop_geometry = QtGui.qApp.desktop().geometry()
         global_position = self.mapToGlobal(position)
-        if global_position.y() + geometry.height() > desktop_geometry.height():
+        if global_position.y() + height > desktop_geometry.height():
             # Move the completer to above the current line
             position = self.cursorRect(cur).topLeft() + self.viewport().pos()
             global_position = self.mapToGlobal(position)
-            global_position -= QtCore.QPoint(0, geometry.height())
+            global_position -= QtCore.QPoint(0, height)
         
-        self.__completer.popup().move(global_position)
+        popup.move(global_position)
     
     
     def __updateAutocompleterPrefix(self):
@@ -187,7 +272,8 @@ class AutoCompletion(object):
         (out of several possiblilties) which is best suited
         """
         if not self.autocompleteActive():
-            self.__completer.popup().hide() #TODO: why is this required?
+            if self.__completer.widget() is self:
+                self.__completer.popup().hide() #TODO: why is this required?
             return
         
         #Select the text from autocompleteStart until the current cursor
@@ -203,28 +289,33 @@ class AutoCompletion(object):
             # __recentCompletions list, but prefer completions with matching
             # case if they exists
             
-            # Create a list of (row, value) tuples of all possible completions
-            completions = [
-                (row, model.data(model.index(row,0),self.__completer.completionRole()))
-                for row in range(model.rowCount())
-                ]
+            # Create a list of (row, value) tuples of all possible completions.
+            # Without a prefix, the completion model lists all names of the
+            # source model, and getting these in one call is much faster
+            # than getting each row. With a prefix, the completion model is
+            # already filtered and usually small, so use its rows.
+            names = None
+            if not prefix:
+                names = self.__completerModel.stringList()
+            if names is not None and len(names) == model.rowCount():
+                completions = list(enumerate(names))
+            else:
+                completions = [
+                    (row, model.data(model.index(row,0),self.__completer.completionRole()))
+                    for row in range(model.rowCount())
+                    ]
             
-            # Define a function to get the position in the __recentCompletions
-            def completionIndex(data):
-                try:
-                    return self.__recentCompletions.index(data)
-                except ValueError:
-                    return -1
+            # Get the position of each name in the __recentCompletions
+            recentIndex = dict((name, i) for i, name in 
+                                        enumerate(self.__recentCompletions))
             
-            # Sort twice; the last sort has priority over the first
+            # Select the best match, preferring matching case, and then
+            # the most recent completion. One pass, no need to sort.
+            bestMatch = max(completions, key = lambda c: 
+                    (c[1].startswith(prefix), recentIndex.get(c[1], -1)) )
             
-            # Sort on most recent completions
-            completions.sort(key = lambda c: completionIndex(c[1]), reverse = True)
-            # Sort on matching case (prefer matching case)
-            completions.sort(key = lambda c: c[1].startswith(prefix), reverse = True)
-
             # apply the best match
-            bestMatchRow = completions[0][0]
+            bestMatchRow = bestMatch[0]
             self.__completer.popup().setCurrentIndex(model.index(bestMatchRow,0));
 
                 
@@ -243,6 +334,12 @@ class AutoCompletion(object):
         """
         if self.autocompleteActive():
             if event.key() in self.__autocompletionAcceptKeys:
+                # Make sure the highlighted completion is up to date
+                if self.__updateTimer.isActive():
+                    self.__updateTimer.stop()
+                    self.__updateAutocompleterNow()
+                if not self.autocompleteActive():
+                    return 0
                 if event.key() <= 128:
                     self.onAutoComplete()  # No arg: select last highlighted
                     self.autocompleteCancel()
@@ -281,6 +378,12 @@ class AutoCompletion(object):
         
         if self.autocompleteActive():
             #While we type, the start of the autocompletion may move due to line
-            #wrapping, so reposition after every key stroke
+            #wrapping, so reposition after key strokes (using a timer)
+            self.__updateTimer.start()
+    
+    
+    def __updateAutocompleterNow(self):
+        """ Called by the update timer after typing. """
+        if self.autocompleteActive():
             self.__positionAutocompleter()
             self.__updateAutocompleterPrefix()
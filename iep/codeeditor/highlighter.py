@@ -39,6 +39,11 @@ class Highlighter(QtGui.QSyntaxHighlighter):
         
         # Store reference to editor
         self._codeEditor = codeEditor
+        
+        # Map token names to style formats (or None if there is no style).
+        # The editor updates its style formats in-place, so the mapping
+        # remains valid when the style changes.
+        self._tokenFormats = {}
     
     
     def getCurrentBlockUserData(self):
@@ -77,8 +82,9 @@ class Highlighter(QtGui.QSyntaxHighlighter):
         if hasattr(self._codeEditor, 'parser'):
             parser = self._codeEditor.parser()
         
-        # Get function to get format
+        # Get function to get format, and the buffer of formats
         nameToFormat = self._codeEditor.getStyleElementFormat
+        tokenFormats = self._tokenFormats
         
         fullLineFormat = None
         if parser:
@@ -90,11 +96,16 @@ class Highlighter(QtGui.QSyntaxHighlighter):
                 else:
                     # Get format
                     try:
-                        styleFormat = nameToFormat(token.name)
-                        charFormat = styleFormat.textCharFormat
+                        styleFormat = tokenFormats[token.name]
                     except KeyError:
-                        #print(repr(nameToFormat(token.name)))
+                        try:
+                            styleFormat = nameToFormat(token.name)
+                        except KeyError:
+                            styleFormat = None
+                        tokenFormats[token.name] = styleFormat
+                    if styleFormat is None:
                         continue
+                    charFormat = styleFormat.textCharFormat
                     # Set format
                     self.setFormat(token.start,token.end-token.start,charFormat)
                     # Is this a cell?
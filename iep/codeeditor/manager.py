@@ -36,6 +36,9 @@ class Manager:
     _parserInstances = {}
     _fileExtensions = {}
     
+    # Default dummy parser, parsers are stateless so it can be shared
+    _dummyParser = parsers.Parser()
+    
     ## Parsers
     
 #     @classmethod
@@ -157,7 +160,7 @@ class Manager:
         
         """
         if not parserName:
-            return parsers.Parser() #Default dummy parser
+            return cls._dummyParser #Default dummy parser
             
         # Case insensitive
         parserName = parserName.lower()
@@ -168,7 +171,7 @@ class Manager:
         else:
             print('Warning: no parser known by the name "%s".'%parserName)
             print('I know these: ', cls._parserInstances.keys())
-            return parsers.Parser() #Default dummy parser
+            return cls._dummyParser #Default dummy parser
     
     
     @classmethod
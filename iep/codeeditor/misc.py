@@ -14,9 +14,9 @@ import sys
 from .qt import QtGui, QtCore
 from queue import Queue, Empty
 
-# Set Python version as a float and get some names
-PYTHON_VERSION = sys.version_info[0] + sys.version_info[1]/10.0
-if PYTHON_VERSION < 3:
+# Get the Python version and some names
+IS_PY2 = sys.version_info[0] < 3
+if IS_PY2:
     ustr = unicode
     bstr = str
 else:
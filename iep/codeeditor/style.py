@@ -17,10 +17,45 @@ instances. These have a name, description and default format, which
 makes it easy to build a UI to allow the user to change the syle.
 
 """
+import re
+
 from .qt import QtGui, QtCore
 Qt = QtCore.Qt
 
 
+# Cache that maps a format string to its parsed (key, value) parts. Each
+# editor applies the same set of format strings when it is created, so
+# this saves parsing them over and over again.
+_parsedFormats = {}
+
+# To split a format string in parts (also eats the surrounding whitespace)
+_formatSplitter = re.compile(r'\s*[,;]\s*')
+
+# Cache of QColor instances, so that styles that use the same color
+# share a single object.
+_colors = {}
+
+def _getColor(text):
+    try:
+        return _colors[text]
+    except KeyError:
+        color = _colors[text] = QtGui.QColor(text)
+        return color
+
+# Lookup tables to translate style values to Qt constants
+_UNDERLINES = { 'yes': QtGui.QTextCharFormat.SingleUnderline,
+                'true': QtGui.QTextCharFormat.SingleUnderline,
+                'dotted': QtGui.QTextCharFormat.DotLine,
+                'dots': QtGui.QTextCharFormat.DotLine,
+                'dotline': QtGui.QTextCharFormat.DotLine,
+                'wave': QtGui.QTextCharFormat.WaveUnderline }
+
+_LINESTYLES = { 'dotted': Qt.DotLine, 'dot': Qt.DotLine, 
+                'dots': Qt.DotLine, 'dotline': Qt.DotLine,
+                'dashed': Qt.DashLine, 'dash': Qt.DashLine, 
+                'dashes': Qt.DashLine, 'dashline': Qt.DashLine }
+
+
 class StyleElementDescription:
     """ StyleElementDescription(name, defaultFormat, description)
     
@@ -113,10 +148,7 @@ class StyleFormat:
     def __str__(self):
         """ Get a (cleaned up) string representation of this style format. 
         """
-        parts = []
-        for key in self._parts:
-            parts.append('%s:%s' % (key, self._parts[key]))
-        return ', '.join(parts)
+        return ', '.join('%s:%s' % part for part in self._parts.items())
     
     
     def __repr__(self):
@@ -132,10 +164,7 @@ class StyleFormat:
     def __iter__(self):
         """ Yields a series of tuples (key, val).
         """
-        parts = []
-        for key in self._parts:
-            parts.append( (key, self._parts[key]) )
-        return parts.__iter__()
+        return iter(tuple(self._parts.items()))
     
     
     def update(self, format):
@@ -152,12 +181,31 @@ class StyleFormat:
         if isinstance(format, StyleFormat):
             format = str(format)
         
-        # Split on ',' and ',', ignore spaces
-        styleParts = [p for p in
-                        format.replace('=',':').replace(';',',').split(',')]
+        # Parse (or get from cache) and store in parts
+        try:
+            parts = _parsedFormats[format]
+        except KeyError:
+            parts = _parsedFormats[format] = self._parseFormat(format)
+        self._parts.update(parts)
+    
+    
+    @staticmethod
+    def _parseFormat(format):
+        """ _parseFormat(format)
+        
+        Parse the given format string into a tuple of (key, value) tuples.
+        
+        """
+        parts = []
+        
+        # Split on ',' and ';', ignore spaces and empty parts
+        styleParts = _formatSplitter.split(format.replace('=',':'))
         
         for stylePart in styleParts:
             
+            if not stylePart:
+                continue
+            
             # Make sure it consists of identifier and value pair
             # e.g. fore:#xxx, bold:yes, underline:no
             if not ':' in stylePart:
@@ -171,10 +219,12 @@ class StyleFormat:
             
             # Store in parts
             if key == 'foreandback':
-                self._parts['fore'] = val
-                self._parts['back'] = val
+                parts.append( ('fore', val) )
+                parts.append( ('back', val) )
             elif key:
-                self._parts[key] = val
+                parts.append( (key, val) )
+        
+        return tuple(parts)
     
     ## Properties
     
@@ -187,59 +237,40 @@ class StyleFormat:
     @property
     def fore(self):
         if self._fore is None:
-            self._fore = QtGui.QColor(self._parts['fore'])
+            self._fore = _getColor(self._parts['fore'])
         return self._fore
     
     @property
     def back(self):
         if self._back is None:
-            self._back = QtGui.QColor(self._parts['back'])
+            self._back = _getColor(self._parts['back'])
         return self._back
     
     @property
     def bold(self):
         if self._bold is None:
-            if self._getValueSafe('bold') in ['yes', 'true']:
-                self._bold = True
-            else:
-                self._bold = False
+            self._bold = self._getValueSafe('bold') in ('yes', 'true')
         return self._bold
     
     @property
     def italic(self):
         if self._italic is None:
-            if self._getValueSafe('italic') in ['yes', 'true']:
-                self._italic = True
-            else:
-                self._italic = False
+            self._italic = self._getValueSafe('italic') in ('yes', 'true')
         return self._italic
     
     @property
     def underline(self):
         if self._underline is None:
             val = self._getValueSafe('underline')
-            if val in ['yes', 'true']:
-                self._underline = QtGui.QTextCharFormat.SingleUnderline
-            elif val in ['dotted', 'dots', 'dotline']: 
-                self._underline = QtGui.QTextCharFormat.DotLine
-            elif val in ['wave']: 
-                self._underline = QtGui.QTextCharFormat.WaveUnderline
-            else:
-                self._underline = QtGui.QTextCharFormat.NoUnderline
+            self._underline = _UNDERLINES.get(val, 
+                                    QtGui.QTextCharFormat.NoUnderline)
         return self._underline
     
     @property
     def linestyle(self):
         if self._linestyle is None:
             val = self._getValueSafe('linestyle')
-            if val in ['yes', 'true']:
-                self._linestyle = Qt.SolidLine
-            elif val in ['dotted', 'dot', 'dots', 'dotline']: 
-                self._linestyle = Qt.DotLine
-            elif val in ['dashed', 'dash', 'dashes', 'dashline']: 
-                self._linestyle = Qt.DashLine
-            else:
-                self._linestyle = Qt.SolidLine # default to solid
+            self._linestyle = _LINESTYLES.get(val, Qt.SolidLine) # default solid
         return self._linestyle
     
     @property
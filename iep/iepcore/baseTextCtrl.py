@@ -15,7 +15,6 @@ is common for both shells and editors.
 import iep
 import os, sys, time
 import weakref
-from pyzolib import ssdf
 from iep.iepcore.iepLogging import print
 import iep.codeeditor.parsers.tokens as Tokens
 
@@ -35,6 +34,14 @@ subStyleStuff = {}
 #                    'underline': Qsci.QsciScintillaBase.SCI_STYLESETUNDERLINE}
 
 
+# Buffer of paths that have been normalized, so that we do not need to
+# list directories for each path component each time. Maps path to
+# (expireTime, normalizedPath). The entries expire, so that renames on
+# the file system (e.g. changing only the case) are picked up.
+_normalizedPaths = {}
+_normalizedPathsTimeout = 10 # seconds
+_maxNormalizedPaths = 256
+
 def normalizePath(path):
     """ Normalize the path given. 
     All slashes will be made the same (and doubles removed)
@@ -54,6 +61,11 @@ def normalizePath(path):
     if not os.path.isfile(path):
         return path
     
+    # Normalized before (and not expired)?
+    entry = _normalizedPaths.get(path, None)
+    if entry is not None and entry[0] > time.time():
+        return entry[1]
+    
     # split drive name from the rest
     drive, rest = os.path.splitdrive(path)
     fullpath = drive.upper() + os.sep
@@ -63,29 +75,70 @@ def normalizePath(path):
     parts = [part for part in parts if part]
     
     for part in parts:
-        options = [x for x in os.listdir(fullpath) if x.lower()==part]
-        if len(options) > 1:
-            print("Error normalizing path: Ambiguous path names!")
-            return path
-        elif not options:
+        # Find the matching entry, stop as soon as we know it's ambiguous
+        found = None
+        for x in os.listdir(fullpath):
+            if x.lower() == part:
+                if found is not None:
+                    print("Error normalizing path: Ambiguous path names!")
+                    return path
+                found = x
+        if found is None:
             print("Invalid path (part %s) in %s" % (part, fullpath))
             return path
-        fullpath = os.path.join(fullpath, options[0])
-    
-    # remove last sep
+        fullpath = os.path.join(fullpath, found)
+    
+    # Store and return
+    if len(_normalizedPaths) >= _maxNormalizedPaths:
+        # Drop expired entries, or all entries if that does not help
+        now = time.time()
+        for key, entry in list(_normalizedPaths.items()):
+            if entry[0] < now:
+                del _normalizedPaths[key]
+        if len(_normalizedPaths) >= _maxNormalizedPaths:
+            _normalizedPaths.clear()
+    _normalizedPaths[path] = (time.time() + _normalizedPathsTimeout, fullpath)
     return fullpath
 
 
+# The characters after which autocompletion is attempted
+_autocompChars = frozenset(Tokens.ALPHANUM + '._')
+
+# The characters that names consist of
+_nameChars = frozenset(Tokens.ALPHANUM + '_')
+
+
 def parseLine_autocomplete(tokens):
     """ Given a list of tokens (from start to cursor position) 
     returns a tuple (base, name).    
     autocomp_parse("eat = banan") -> "", "banan"
       ...("eat = food.fruit.ban") -> "food.fruit", "ban"
     When no match found, both elements are an empty string.
+    Instead of a list of tokens, the text of the line can also be given.
     """
     if not len(tokens):
         return "",""
     
+    if isinstance(tokens, str):
+        # Walk back over the dotted name at the end of the text. (A regex 
+        # searching for it takes quadratic time on long runs of word chars.)
+        # Parts that start with a digit are numbers, not names.
+        text = tokens
+        i = len(text)
+        while i and text[i-1] in _nameChars:
+            i -= 1
+        if text[i:i+1].isdigit():
+            return '', ''
+        name, end = text[i:], i
+        while i > 1 and text[i-1] == '.' and text[i-2] in _nameChars:
+            j = i - 1
+            while j and text[j-1] in _nameChars:
+                j -= 1
+            if text[j].isdigit():
+                break
+            i = j
+        return text[i:end-1] if i < end else '', name
+    
     if isinstance(tokens[-1],Tokens.NonIdentifierToken) and str(tokens[-1])=='.':
         name = ''
     elif isinstance(tokens[-1],(Tokens.IdentifierToken,Tokens.KeywordToken)):
@@ -93,16 +146,18 @@ def parseLine_autocomplete(tokens):
     else:
         return '',''
         
-    needle = ''
+    needleParts = []
     #Now go through the remaining tokens in reverse order
     for token in tokens[-2::-1]:
         if isinstance(token,Tokens.NonIdentifierToken) and str(token)=='.':
-            needle = str(token) + needle
+            needleParts.append(str(token))
         elif isinstance(token,(Tokens.IdentifierToken,Tokens.KeywordToken)):
-            needle = str(token) + needle
+            needleParts.append(str(token))
         else:
             break
     
+    # Join once, rather than prepending to a string for each token
+    needle = ''.join(reversed(needleParts))
     if needle.endswith('.'):
         needle = needle[:-1]
         
@@ -129,7 +184,13 @@ def parseLine_signature(tokens):
     if len(openBraces):
         i = openBraces[-1]
         # Now trim the token list up to (but not inculding) position of openBraces
-        tokens = list(filter(lambda token: token.start < i, tokens))
+        # The tokens are ordered, so we can stop at the first one beyond i
+        n = 0
+        for token in tokens:
+            if token.start >= i:
+                break
+            n += 1
+        tokens = tokens[:n]
         
         # Trim the last token
         if len(tokens):
@@ -166,6 +227,29 @@ def makeBytes(text):
         raise ValueError("Expected str or bytes!")
 
 
+_acceptKeys = {}
+def getAcceptKeys(keysString):
+    """ getAcceptKeys(keysString)
+    Get a tuple of Qt keys from a space separated string of key names
+    (e.g. "Tab Return"). The result is buffered, because all editors
+    and shells use the same string.
+    """
+    if keysString not in _acceptKeys:
+        qtKeys = []
+        for key in keysString.split(' '):
+            if len(key) > 1:
+                key = 'Key_' + key[0].upper() + key[1:].lower()
+                qtkey = getattr(QtCore.Qt, key, None)
+            elif key:
+                qtkey = ord(key)
+            else:
+                qtkey = None
+            if qtkey:
+                qtKeys.append(qtkey)
+        _acceptKeys[keysString] = tuple(qtKeys)
+    return _acceptKeys[keysString]
+
+
 _allScintillas = []
 def getAllScintillas():
     """ Get a list of all the scintialla editing components that 
@@ -219,8 +303,7 @@ class BaseTextCtrl(codeeditor.CodeEditor):
         self._callTipBuffer_time = 0
         self._callTipBuffer_result = ''
         self._autoCompBuffer_name = ''
-        self._autoCompBuffer_time = 0
-        self._autoCompBuffer_result = []
+        self._autoCompBuffers = {} # bufferName -> (expireTime, generation, names)
         
         # The string with names given to SCI_AUTOCSHOW
         self._autoCompNameString = ''
@@ -231,18 +314,9 @@ class BaseTextCtrl(codeeditor.CodeEditor):
             iep.config.settings.autoComplete_acceptKeys = 'Tab'
         
         # Set autocomp accept keys
-        qtKeys = []
-        for key in iep.config.settings.autoComplete_acceptKeys.split(' '):
-            if len(key) > 1:
-                key = 'Key_' + key[0].upper() + key[1:].lower()
-                qtkey = getattr(QtCore.Qt, key, None)
-            else:
-                qtkey = ord(key)
-            if qtkey:
-                qtKeys.append(qtkey)
+        qtKeys = getAcceptKeys(iep.config.settings.autoComplete_acceptKeys)
         self.setAutoCompletionAcceptKeys(*qtKeys)
         
-        self.completer().highlighted.connect(self.updateHelp)
         self.setIndentUsingSpaces(iep.config.settings.defaultIndentUsingSpaces)
         self.setIndentWidth(iep.config.settings.defaultIndentWidth) 
         self.setAutocompletPopupSize(*iep.config.view.autoComplete_popupSize) 
@@ -280,8 +354,22 @@ class BaseTextCtrl(codeeditor.CodeEditor):
         which are implemented in the editor and shell classes.
         """
         
-        # Find the tokens up to the cursor
+        # Find the text up to the cursor
         cursor = self.textCursor()
+        text = cursor.block().text()[:cursor.positionInBlock()]
+        
+        # Is the char valid for auto completion?
+        if tryAutoComp:
+            if not iep.config.settings.autoComplete:
+                tryAutoComp = False
+            elif not text or text[-1] not in _autocompChars:
+                self.autocompleteCancel()
+                tryAutoComp = False
+        
+        # Done if there is nothing to introspect; no need to parse the line
+        if not (tryAutoComp or iep.config.settings.autoCallTip):
+            self._delayTimer.stop()
+            return
         
         # In order to find the tokens, we need the userState from the highlighter
         if cursor.block().previous().isValid():
@@ -289,20 +377,12 @@ class BaseTextCtrl(codeeditor.CodeEditor):
         else:
             previousState = 0
         
-        text = cursor.block().text()[:cursor.positionInBlock()]
-        
         tokensUptoCursor = list(
                 filter(lambda token:token.isToken, #filter to remove BlockStates
                 self.parser().parseLine(text, previousState)))
         
         # TODO: Only proceed if valid python (no need to check for comments/
         # strings, this is done by the processing of the tokens). Check for python style
-       
-        # Is the char valid for auto completion?
-        if tryAutoComp:
-            if not text or not ( text[-1] in (Tokens.ALPHANUM + "._") ):
-                self.autocompleteCancel()
-                tryAutoComp = False
         
         # Store line and (re)start timer
         cursor.setKeepPositionOnInsert(True)
@@ -396,6 +476,11 @@ class BaseTextCtrl(codeeditor.CodeEditor):
         
     
     ## Callbacks
+    def _setHighlightedCompletion(self, value):
+        """ Also show help on the highlighted name. """
+        super()._setHighlightedCompletion(value)
+        self.updateHelp(value)
+    
     def updateHelp(self,name):
         """A name has been highlighted, show help on that name"""
         
@@ -436,9 +521,8 @@ class BaseTextCtrl(codeeditor.CodeEditor):
         """
         
         # Get ordinal key
-        ordKey = -1
-        if event.text():
-            ordKey = ord(event.text()[0])
+        text = event.text()
+        ordKey = ord(text[0]) if text else -1
         
         # Cancel any introspection in progress
         self._delayTimer._line = ''
@@ -515,6 +599,23 @@ class CallTipObject:
         self.textCtrl.calltipShow(self.offset, callTipText, True)
 
 
+# The autocompletion names are buffered per textCtrl for several objects
+# at once, so that moving between e.g. "os.path." and "sys." does not
+# require a new request to the shell each time. The buffers are only valid
+# while the namespace in the shell is unchanged; each time the shell
+# executes code, the generation is increased.
+_maxAutoCompBuffers = 32
+_autoCompGeneration = 0
+
+def invalidateAutoCompBuffers():
+    """ invalidateAutoCompBuffers()
+    Invalidate the buffered autocompletion names of all editors and 
+    shells. Called by the shell when it executes code.
+    """
+    global _autoCompGeneration
+    _autoCompGeneration += 1
+
+
 class AutoCompObject:
     """ Object to help the process of auto completion. 
     An instance of this class is created for each auto completion action.
@@ -539,13 +640,17 @@ class AutoCompObject:
         Try performing this auto-completion using the buffer. 
         Returns True on success.
         """
-        bufferName = self.textCtrl._autoCompBuffer_name
-        t = time.time() - self.textCtrl._autoCompBuffer_time
-        if ( self.bufferName == bufferName and t < 0 ):
-            self._finish(self.textCtrl._autoCompBuffer_result)
-            return True
-        else:
+        buffers = self.textCtrl._autoCompBuffers
+        entry = buffers.get(self.bufferName, None)
+        if entry is None:
+            return False
+        expireTime, generation, names = entry
+        if generation != _autoCompGeneration or time.time() > expireTime:
+            del buffers[self.bufferName]
             return False
+        self.textCtrl._autoCompBuffer_name = self.bufferName
+        self._finish(names)
+        return True
     
     def finish(self):
         """ finish()
@@ -576,13 +681,22 @@ class AutoCompObject:
         # Get names
         if names is None:
             names = self.names
-        # Make list and sort
-        names = list(names)
-        names.sort(key=str.upper)
+        # Make sorted list (the buffer holds the sorted list, so names 
+        # that come from the buffer need not be sorted again)
+        names = sorted(names, key=str.upper)
         # Store
+        buffers = self.textCtrl._autoCompBuffers
+        if len(buffers) >= _maxAutoCompBuffers:
+            # Drop entries that are expired or belong to an old namespace
+            now = time.time()
+            for key, entry in list(buffers.items()):
+                if entry[1] != _autoCompGeneration or entry[0] < now:
+                    del buffers[key]
+            if len(buffers) >= _maxAutoCompBuffers:
+                buffers.clear()
+        buffers[self.bufferName] = (time.time() + timeout, 
+                                    _autoCompGeneration, names)
         self.textCtrl._autoCompBuffer_name = self.bufferName
-        self.textCtrl._autoCompBuffer_time = time.time() + timeout
-        self.textCtrl._autoCompBuffer_result = names
         # Return sorted list
         return names
     
@@ -596,6 +710,7 @@ class AutoCompObject:
         given list of names. Returns the (part of) the name that's in
         the list, or None otherwise.
         """
+        importNames = set(importNames) # Fast membership test
         baseName = self.name
         while baseName not in importNames:
             if '.' in baseName:
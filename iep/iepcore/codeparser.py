@@ -48,6 +48,7 @@ class Result:
         self.rootItem = rootItem
         self.importList = importList
         self.editorId = editorId
+        self._imports = None # Buffer for getFictiveImports
     
     def isMatch(self, editorId):
         """ isMatch(editorId):
@@ -201,13 +202,16 @@ class Parser(threading.Thread):
         if result is None or not result.isMatch(editor):
             return [], []
         
-        # Extract list of names and dict of lines
-        imports = []
-        importlines = {}
-        for item in result.importList:
-            imports.append(item.name)
-            importlines[item.name] = item.text
-        return imports, importlines
+        # Extract list of names and dict of lines. A result does not change,
+        # so this is done only once for each result.
+        if result._imports is None:
+            imports = []
+            importlines = {}
+            for item in result.importList:
+                imports.append(item.name)
+                importlines[item.name] = item.text
+            result._imports = imports, importlines
+        return result._imports
     
     
     def _getResult(self):
@@ -633,6 +637,8 @@ class FictiveObject:
     
 
 namechars = 'abcdefghijklmnopqrstuvwxyz_0123456789'
+_firstNameCharSet = frozenset(namechars[0:-10])
+_nameCharSet = frozenset(namechars)
 def IsValidName(name):
     """ Given a string, checks whether it is a 
     valid name (dots are not valid!)
@@ -640,10 +646,12 @@ def IsValidName(name):
     if not name:
         return False
     name = name.lower()
-    if name[0] not in namechars[0:-10]:
+    if name[0] not in _firstNameCharSet:
         return False
-    tmp = map(lambda x: x not in namechars, name[2:])
-    return sum(tmp)==0
+    for c in name[1:]:
+        if c not in _nameCharSet:
+            return False
+    return True
     
     
 def ParseImport(names):
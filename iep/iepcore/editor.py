@@ -470,9 +470,10 @@ class IepEditor(BaseTextCtrl):
         if self.testWhetherFileWasChanged():
             return
         
-        # Get text, convert line endings
+        # Get text, convert line endings (no need to copy the text for LF)
         text = self.toPlainText()
-        text = text.replace('\n', self.lineEndings)
+        if self.lineEndings != '\n':
+            text = text.replace('\n', self.lineEndings)
         
         # Make bytes
         bb = text.encode(self.encoding)
@@ -849,7 +849,7 @@ class FileTabWidget(CompactTabWidget):
             
             # Get number of blocks
             nBlocks = item.editor.blockCount()
-            if nBlocks == 1 and not item.editor.toPlainText():
+            if nBlocks == 1 and item.editor.document().isEmpty():
                 nBlocks = 0
             
             # Update appearance of icon
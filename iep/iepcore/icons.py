@@ -139,6 +139,10 @@ class TabCloseButton(QtGui.QToolButton):
     
     SIZE = 5,8
     
+    # The icons for the normal and hover state, created when first needed
+    _cross1 = None
+    _cross2 = None
+    
     def __init__(self):
         QtGui.QToolButton.__init__(self)
         
@@ -188,19 +192,15 @@ class TabCloseButton(QtGui.QToolButton):
         return artist.finish().pixmap(*self.SIZE)
     
     def getCrossIcon1(self):
-        if hasattr(self, '_cross1'):
-            pm = self._cross1
-        else:
-            pm = self._createCrossPixmap(80)
-        return QtGui.QIcon(pm)
+        # The icons are the same for all buttons, so store them on the class
+        if TabCloseButton._cross1 is None:
+            TabCloseButton._cross1 = QtGui.QIcon(self._createCrossPixmap(80))
+        return TabCloseButton._cross1
     
     def getCrossIcon2(self):
-        if hasattr(self, '_cross2'):
-            pm = self._cross2
-        else:
-            pm = self._createCrossPixmap(240)
-        # Set
-        return QtGui.QIcon(pm)
+        if TabCloseButton._cross2 is None:
+            TabCloseButton._cross2 = QtGui.QIcon(self._createCrossPixmap(240))
+        return TabCloseButton._cross2
 
 
 # todo: not used; remove me?
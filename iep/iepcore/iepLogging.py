@@ -11,13 +11,16 @@ Functionality for logging in IEP.
 
 """
 
-import sys, os, time
-import code
+import sys, time
+import collections
 import iep
 iep.status = None
 
 # todo: enable logging to a file?
 
+# The maximum number of written pieces of text to keep in the history
+HISTORY_LIMIT = 10000
+
 # Define prompts
 try:
     sys.ps1
@@ -103,22 +106,20 @@ class OutputStreamSplitter:
             self._deferFunction = fileObject._deferFunction
         else:
             self._original = fileObject
-            self._history = []
-            self._deferFunction = self.dummyDeferFunction
+            self._history = collections.deque(maxlen=HISTORY_LIMIT)
+            self._deferFunction = None
         
         # Replace original with a dummy if None
         if self._original is None:
             self._original = DummyStd()
     
     
-    def dummyDeferFunction(self, text):
-        pass
-    
     def write(self, text):
         """ Write method. """
         self._original.write(text)
         self._history.append(text)
-        self._deferFunction(text)
+        if self._deferFunction is not None:
+            self._deferFunction(text)
         # Show in statusbar
         if iep.status and len(text)>1:
             iep.status.showMessage(text, 5000)
@@ -137,6 +138,8 @@ class OutputStreamSplitter:
     def encoding(self):
         return self._original.encoding()
 
-# Split now, with no defering
-splitConsole()
+# Split now, with no defering. Unless already split; on a reload of this
+# module the class is recreated, so compare by name.
+if type(sys.stdout).__name__ != OutputStreamSplitter.__name__:
+    splitConsole()
 
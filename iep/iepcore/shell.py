@@ -27,7 +27,7 @@ from pyzolib import ssdf
 from iep.codeeditor.highlighter import Highlighter
 from iep.codeeditor import parsers
 
-from iep.iepcore.baseTextCtrl import BaseTextCtrl
+from iep.iepcore.baseTextCtrl import BaseTextCtrl, invalidateAutoCompBuffers
 from iep.iepcore.iepLogging import print
 from iep.iepcore.kernelbroker import KernelInfo, Kernelmanager
 from iep.iepcore.menu import ShellContextMenu
@@ -901,8 +901,8 @@ class PythonShell(BaseShell):
         editor1 = iep.editors.getCurrentEditor()
         editor2 = iep.shells.getCurrentShell()
         if cto.textCtrl not in [editor1, editor2]:
-            # The editor or shell starting the autocomp is no longer active
-            aco.textCtrl.autocompleteCancel()
+            # The editor or shell starting the calltip is no longer active
+            cto.textCtrl.calltipCancel()
             return
         
         # Invalid response
@@ -1008,6 +1008,7 @@ class PythonShell(BaseShell):
         """ executeCommand(text)
         Execute one-line command in the remote Python session. 
         """
+        invalidateAutoCompBuffers()
         self._ctrl_command.send(text)
     
     
@@ -1072,6 +1073,7 @@ class PythonShell(BaseShell):
         # Send message
         text = "\n".join(lines2)
         msg = {'source':text, 'fname':fname, 'lineno':lineno, 'cellName': cellName}
+        invalidateAutoCompBuffers()
         self._ctrl_code.send(msg)
     
     
@@ -1098,8 +1100,9 @@ class PythonShell(BaseShell):
                 # Optimization: handle backspaces on stack of messages
                 if sub is self._strm_out:
                     M = self._handleBackspacesOnList(M)
-            # New prompt?
+            # New prompt? Then the namespace may have changed
             if sub is self._strm_prompt:
+                invalidateAutoCompBuffers()
                 self.stateChanged.emit(self)
         
         # Write all pending messages that are later than any other message
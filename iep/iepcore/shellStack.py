@@ -48,11 +48,12 @@ def shellTitle(shell, moreinfo=False):
     # Build state text
     stateText = shell._state or ''
     
-    # Build text for elapsed time
-    elapsed = time.time() - shell._start_time
-    hh = elapsed//3600
-    mm = (elapsed - hh*3600)//60
-    ss = elapsed - hh*3600 - mm*60
+    # Build text for elapsed time (start time is 0 until the shell is started)
+    elapsed = 0
+    if shell._start_time:
+        elapsed = int(time.time() - shell._start_time)
+    mm, ss = divmod(elapsed, 60)
+    hh, mm = divmod(mm, 60)
     runtimeText = 'runtime: %i:%02i:%02i' % (hh, mm, ss)
     
     # Build text
@@ -92,8 +93,9 @@ class ShellStackWidget(QtGui.QWidget):
         self._toolbar.setMaximumHeight(25)
         self._toolbar.setIconSize(QtCore.QSize(16,16))
         
-        # create stack
+        # create stack, and keep a list of the shells in it
         self._stack = QtGui.QStackedWidget(self)
+        self._shells = []
         
         # Populate toolbar
         self._shellButton = ShellControl(self._toolbar, self._stack)
@@ -111,16 +113,25 @@ class ShellStackWidget(QtGui.QWidget):
         layout.addWidget(self._stack)
         self.setLayout(layout)
         
+        # Timer to update the shell menu and window icon for state changes
+        # of shells in one go, since a shell can change state several times
+        # in a short while
+        self._pendingStateShells = []
+        self._stateTimer = QtCore.QTimer(self)
+        self._stateTimer.setSingleShot(True)
+        self._stateTimer.setInterval(0)
+        self._stateTimer.timeout.connect(self._processShellStateChanges)
+        
+        # The icon that we last set on the main window
+        self._windowIcon = None
+        
         # make callbacks
         self._stack.currentChanged.connect(self.onCurrentChanged)
     
     
     def __iter__(self):
-        i = 0
-        while i < self._stack.count():
-            w = self._stack.widget(i)
-            i += 1
-            yield w 
+        # Iterate over a copy, so that shells can be removed meanwhile
+        return iter(list(self._shells))
     
     
     def addShell(self, shellInfo=None):
@@ -130,6 +141,7 @@ class ShellStackWidget(QtGui.QWidget):
         # Create shell and add to stack
         shell = PythonShell(self, shellInfo)
         index = self._stack.addWidget(shell)
+        self._shells.append(shell)
         # Bind to signals
         shell.stateChanged.connect(self.onShellStateChange)
         shell.debugStateChanged.connect(self.onShellDebugStateChange)
@@ -143,6 +155,10 @@ class ShellStackWidget(QtGui.QWidget):
         Remove an existing shell from the widget
         """
         self._stack.removeWidget(shell)
+        if shell in self._shells:
+            self._shells.remove(shell)
+        if shell in self._pendingStateShells:
+            self._pendingStateShells.remove(shell)
     
     
     def onCurrentChanged(self, index):
@@ -160,20 +176,45 @@ class ShellStackWidget(QtGui.QWidget):
     
     def onShellStateChange(self, shell):
         """ Called when the shell state changes, and is called
-        by onCurrentChanged. Sets the mainwindow's icon if busy.
+        by onCurrentChanged. The signal is emitted right away, so that
+        listeners see it in order with the other signals. Updating the 
+        shell menu and icon is done in the next event loop iteration, 
+        so that multiple changes result in one update.
+        """
+        if shell not in self._pendingStateShells:
+            self._pendingStateShells.append(shell)
+        self._stateTimer.start()
+        
+        if shell is self.getCurrentShell(): # can be None
+            # Send signal
+            self.currentShellStateChanged.emit()
+    
+    
+    def _processShellStateChanges(self):
+        """ Process the pending state changes of the shells. 
+        """
+        shells, self._pendingStateShells = self._pendingStateShells, []
+        for shell in shells:
+            self._processShellStateChange(shell)
+    
+    
+    def _processShellStateChange(self, shell):
+        """ Update for a state change of the given shell. 
+        Sets the mainwindow's icon if busy.
         """
         
         # Keep shell button and its menu up-to-date
         self._shellButton.updateShellMenu(shell)
        
         if shell is self.getCurrentShell(): # can be None
-            # Update application icon
+            # Update application icon (only if it changes)
             if shell and shell._state in ['Busy']:
-                iep.main.setWindowIcon(iep.iconRunning)
+                icon = iep.iconRunning
             else:
-                iep.main.setWindowIcon(iep.icon)
-            # Send signal
-            self.currentShellStateChanged.emit()
+                icon = iep.icon
+            if icon is not self._windowIcon:
+                self._windowIcon = icon
+                iep.main.setWindowIcon(icon)
     
     
     def onShellDebugStateChange(self, shell):
@@ -196,29 +237,16 @@ class ShellStackWidget(QtGui.QWidget):
         Get the currently active shell.
         """
         
-        w = None
-        if self._stack.count():
-            w = self._stack.currentWidget()
-        if not w:
-            return None
-        else:
-            return w
+        # currentWidget() already returns None when the stack is empty
+        return self._stack.currentWidget() or None
     
     
     def getShells(self):
         """ Get all shell in stack as list """
-        
-        shells = []
-        for i in range(self._stack.count()):
-            shell = self.getShellAt(i)
-            if shell is not None:
-                shells.append(shell)
-        
-        return shells
+        return list(self._shells)
     
     
     def getShellAt(self, i):
-        return
         """ Get shell at current tab index """
         
         return self._stack.widget(i)
@@ -348,6 +376,11 @@ class ShellControl(QtGui.QToolButton):
 
 
 
+# Regular expression to get the filename and linenr from a stack frame
+# line, as in 'File "xxx", line N, in yyy'
+_frameRe = re.compile(r'File "(.+)", line (\d+)')
+
+
 class DebugControl(QtGui.QToolButton):
     """ A button that can be used for post mortem debuggin. 
     """
@@ -364,6 +397,10 @@ class DebugControl(QtGui.QToolButton):
         # Set mode
         self.setPopupMode(self.InstantPopup)
         
+        # The frames that the menu is made for, and the actions for them
+        self._frames = None
+        self._frameActions = []
+        
         # Bind to triggers
         self.pressed.connect(self.onPressed)
         self.triggered.connect(self.onTriggered)
@@ -417,29 +454,37 @@ class DebugControl(QtGui.QToolButton):
         if not frames:
             
             # Remove trace
+            self._frames = None
+            self._frameActions = []
             self.setMenu(None)
             self.setText('Debug')
         
         else:
+            # Create the menu, unless the frames are the same as before
+            # (e.g. when only the selected frame changed)
+            menu = self.menu()
+            if menu is None or frames != self._frames:
+                self._frames = list(frames)
+                self._frameActions = []
+                
+                # Create menu and add __main__
+                menu = QtGui.QMenu(self)
+                self.setMenu(menu)
+                action = menu.addAction('MAIN: stop debugging')
+                action._index = 0
+                
+                # Fill trace
+                for thisIndex, frame in enumerate(frames, 1):
+                    action = menu.addAction('%i: %s' % (thisIndex, frame))
+                    action._index = thisIndex
+                    self._frameActions.append(action)
+            
             # Get the current frame
             theAction = None
-            
-            # Create menu and add __main__
-            menu = QtGui.QMenu(self)
-            self.setMenu(menu)
-            action = menu.addAction('MAIN: stop debugging')
-            action._index = 0
-            
-            # Fill trace
-            for i in range(len(frames)):
-                thisIndex = i + 1
-                action = menu.addAction('{}: {}'.format(thisIndex, frames[i]))
-                action._index = thisIndex
-                action._isCurrent = False
-                if thisIndex == index:
-                    action._isCurrent = True
+            for action in self._frameActions:
+                action._isCurrent = action._index == index
+                if action._isCurrent:
                     theAction = action
-                    
             
             # Highlight current item and set the button text
             if theAction:
@@ -455,12 +500,10 @@ class DebugControl(QtGui.QToolButton):
         Open the file and show the linenr of the given lineFromDebugState.
         """
         # Get filenr and item
-        try:
-            tmp = lineFromDebugState.split(', in ')[0].split(', line ')
-            filename = tmp[0][len('File '):].strip('"')
-            linenr = int(tmp[1].strip())
-        except Exception:
+        match = _frameRe.match(lineFromDebugState.strip())
+        if not match:
             return 'Could not focus!'
+        filename, linenr = match.group(1), int(match.group(2))
         # Cannot open <console>            
         if filename == '<console>':
             return 'Stack frame is <console>.'
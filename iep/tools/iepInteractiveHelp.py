@@ -6,6 +6,7 @@
 
 
 import sys, os, time, re
+import collections
 from iep.codeeditor.qt import QtCore, QtGui
 import iep 
 
@@ -20,26 +21,47 @@ htmlWrap = """<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.0//EN"
 <style type="text/css">
 </style>
 </head>
-<body style=" font-family:'Sans Serif'; font-size:{}pt; font-weight:400; font-style:normal;">
+<body style=" font-family:'Sans Serif'; font-weight:400; font-style:normal;">
 {}
 </body>
 </html>
 """
 
+# The html that goes before and after the text. The font size is not in
+# the html, but set on the browser, so that changing it does not require
+# parsing the html again.
+htmlWrapPrefix, htmlWrapSuffix = htmlWrap.split('{}')
+
+# Table to escape the signs that would otherwise fool the html
+_htmlEscapeTable = str.maketrans({'<': '&lt;', '>': '&gt;'})
+
+# Idem, but also restore the newlines that the kernel hid in the repr
+_reprEscapeTable = str.maketrans({'\r': '\n', '<': '&lt;', '>': '&gt;'})
+
+# Html indentation for the common indentation levels
+_nbspCache = ['&nbsp;' * i for i in range(33)]
+
+# Classify a docstring line in one go: does it contain a header underline,
+# and/or is it a "name : description" line?
+_lineRe = re.compile(r'(?:(?=.*?(?P<header>---|===)))?'
+                        r'(?:(?P<key>.*?) : (?P<rest>.*))?')
+
 # Define title text (font-size percentage does not seem to work sadly.)
 def get_title_text(objectName, h_class='', h_repr=''):
-    title_text = "<p style='background-color:#def;'>"
-    title_text += "<b>Object:</b> {}".format(objectName)
+    parts = ["<p style='background-color:#def;'><b>Object:</b> ", objectName]
     if h_class:
-        title_text += ", <b>class:</b> {}".format(h_class)
+        parts += [", <b>class:</b> ", h_class]
     if h_repr:
         if len(h_repr) > 40:
             h_repr = h_repr[:37] + '...'
-        title_text += ", <b>repr:</b> {}".format(h_repr)
+        parts += [", <b>repr:</b> ", h_repr]
         
     # Finish
-    title_text += '</p>\n'
-    return title_text
+    parts.append('</p>\n')
+    return ''.join(parts)
+
+# The maximum number of shell responses (and resulting texts) to buffer
+_maxBufferedResponses = 128
 
 initText =  """
 Help information is queried from the current shell
@@ -68,11 +90,24 @@ class IepInteractiveHelp(QtGui.QWidget):
         # Create options menu
         self._options._menu = QtGui.QMenu()
         self._options.setMenu(self._options._menu)
+        self._createOptionsMenu()
         
         # Create browser
         self._browser = QtGui.QTextBrowser(self)        
         self._browser_text = initText
         
+        # Buffers for shell responses by name, and for the resulting text
+        # by (name, smartNewlines). Reset when the shell (state) changes.
+        self._responseBuffer = collections.OrderedDict()
+        self._textBuffer = collections.OrderedDict()
+        
+        # Timer to query the doc only once the name has settled, e.g. when
+        # scrolling through the autocompletion list
+        self._queryTimer = QtCore.QTimer(self)
+        self._queryTimer.setSingleShot(True)
+        self._queryTimer.setInterval(80) # ms
+        self._queryTimer.timeout.connect(self.queryDoc)
+        
         # Create two sizers
         self._sizer1 = QtGui.QVBoxLayout(self)
         self._sizer2 = QtGui.QHBoxLayout()
@@ -100,6 +135,7 @@ class IepInteractiveHelp(QtGui.QWidget):
                 config.fontSize = 12
             else:
                 config.fontSize = 10
+        self._applyFontSize()
         
         # Create callbacks
         self._text.returnPressed.connect(self.queryDoc)
@@ -107,33 +143,45 @@ class IepInteractiveHelp(QtGui.QWidget):
         #
         self._options.pressed.connect(self.onOptionsPress)
         self._options._menu.triggered.connect(self.onOptionMenuTiggered)
+        #
+        iep.shells.currentShellChanged.connect(self.clearBuffers)
+        iep.shells.currentShellStateChanged.connect(self.clearBuffers)
         
         # Start
         self.setText()  # Set default text
-        self.onOptionsPress() # Fill menu
+        self.onOptionsPress() # Set checks in menu
     
     
-    def onOptionsPress(self):
-        """ Create the menu for the button, Do each time to make sure
-        the checks are right. """
+    def _createOptionsMenu(self):
+        """ Create the menu for the button. Only done once; the checks are
+        updated in onOptionsPress. """
         
         # Get menu
         menu = self._options._menu
-        menu.clear()
         
         # Add smart format option
-        action = menu.addAction('Smart format')
+        self._smartAction = action = menu.addAction('Smart format')
         action.setCheckable(True)
-        action.setChecked(bool(self._config.smartNewlines))
         
         # Add delimiter
         menu.addSeparator()
         
         # Add font size options
-        currentSize = self._config.fontSize
+        self._sizeActions = {}
         for i in range(8,15):
             action = menu.addAction('font-size: %ipx' % i)
             action.setCheckable(True)
+            self._sizeActions[i] = action
+    
+    
+    def onOptionsPress(self):
+        """ Update the checks in the menu for the button. Do each time 
+        to make sure the checks are right. """
+        
+        self._smartAction.setChecked(bool(self._config.smartNewlines))
+        
+        currentSize = self._config.fontSize
+        for i, action in self._sizeActions.items():
             action.setChecked(i==currentSize)
     
     
@@ -156,7 +204,15 @@ class IepInteractiveHelp(QtGui.QWidget):
             # Update
             self._config.fontSize = size
             # Update
-            self.setText()
+            self._applyFontSize()
+    
+    
+    def _applyFontSize(self):
+        """ Apply the font size from the config to the browser. This
+        relayouts the current text, without setting the html again. """
+        font = self._browser.font()
+        font.setPointSize(self._config.fontSize)
+        self._browser.setFont(font)
     
     
     def setText(self, text=None):
@@ -167,16 +223,36 @@ class IepInteractiveHelp(QtGui.QWidget):
         else:
             self._browser_text = text
         
-        # Set text with html header
-        size = self._config.fontSize
-        self._browser.setHtml(htmlWrap.format(size,text))
+        # Set text with html header. Disable updates meanwhile, so that
+        # the browser repaints only once.
+        browser = self._browser
+        browser.setUpdatesEnabled(False)
+        try:
+            browser.setHtml(htmlWrapPrefix + text + htmlWrapSuffix)
+        finally:
+            browser.setUpdatesEnabled(True)
+    
+    
+    def clearBuffers(self):
+        """ Clear the buffered responses and texts. The namespace of the
+        shell may have changed. """
+        self._responseBuffer.clear()
+        self._textBuffer.clear()
+    
+    
+    def _addToBuffer(self, buffer, key, value):
+        """ Add an item to the given buffer, dropping the oldest item
+        if the buffer is full. """
+        buffer[key] = value
+        if len(buffer) > _maxBufferedResponses:
+            buffer.popitem(last=False)
     
     
     def setObjectName(self, name):
         """ Set the object name programatically
-        and query documentation for it. """
+        and query documentation for it (after a short delay). """
         self._text.setText(name)
-        self.queryDoc()
+        self._queryTimer.start()
     
     
     def printDoc(self):
@@ -191,13 +267,24 @@ class IepInteractiveHelp(QtGui.QWidget):
     
     def queryDoc(self):
         """ Query the doc for the text in the line edit. """
+        # A delayed query is no longer necessary
+        self._queryTimer.stop()
         # Get name
         name = self._text.text()
         # Get shell and ask for the documentation
         shell = iep.shells.getCurrentShell()
         if shell and name:
-            future = shell._request.doc(name)
-            future.add_done_callback(self.queryDoc_response)
+            # Use the buffered text or response if we have it
+            key = name, bool(self._config.smartNewlines)
+            if key in self._textBuffer:
+                self._textBuffer.move_to_end(key)
+                self.setText(self._textBuffer[key])
+            elif name in self._responseBuffer:
+                self._responseBuffer.move_to_end(name)
+                self.processResponse(self._responseBuffer[name])
+            else:
+                future = shell._request.doc(name)
+                future.add_done_callback(self.queryDoc_response)
         elif not name:
             self.setText(initText)
     
@@ -217,14 +304,37 @@ class IepInteractiveHelp(QtGui.QWidget):
             if not response:
                 return
         
+        self.processResponse(response)
+    
+    
+    def processResponse(self, response):
+        """ Turn the response from the shell into rich text and show it. """
+        
+        smartNewlines = bool(self._config.smartNewlines)
+        objectName, text = self.formatResponse(response, smartNewlines)
+        
+        # Buffer (if the response could be parsed)
+        if objectName is not None:
+            self._addToBuffer(self._responseBuffer, objectName, response)
+            self._addToBuffer(self._textBuffer, 
+                                (objectName, smartNewlines), text)
+        
+        # Done
+        self.setText(text)
+    
+    
+    @classmethod
+    def formatResponse(cls, response, smartNewlines):
+        """ Turn the response from the shell into rich text. Returns
+        (objectName, text); objectName is None if the response could 
+        not be parsed. Does not touch the widget. """
+        
         try:
-            # Get parts
-            parts = response.split('\n')                
-            objectName, h_class, h_fun, h_repr = tuple(parts[:4])
-            h_text = '\n'.join(parts[4:])
-            
-            # Obtain newlines that we hid for repr
-            h_repr.replace('/r', '/n')
+            # Get parts (the text is everything after the fourth newline)
+            parts = response.split('\n', 4)
+            if len(parts) == 4:
+                parts.append('')
+            objectName, h_class, h_fun, h_repr, h_text = parts
             
             # Make all newlines \n in h_text and strip
             h_text = h_text.replace('\r\n', '\n').replace('\r', '\n')
@@ -233,13 +343,12 @@ class IepInteractiveHelp(QtGui.QWidget):
             # Init text
             text = ''
             
-            # These signs will fool the html
-            h_repr = h_repr.replace("<","&lt;") 
-            h_repr = h_repr.replace(">","&gt;")
-            h_text = h_text.replace("<","&lt;") 
-            h_text = h_text.replace(">","&gt;")
+            # These signs will fool the html (and obtain newlines that 
+            # we hid for repr)
+            h_repr = h_repr.translate(_reprEscapeTable)
+            h_text = h_text.translate(_htmlEscapeTable)
             
-            if self._config.smartNewlines:
+            if smartNewlines:
                 
                 # Make sure the signature is separated from the rest using at
                 # least two newlines
@@ -261,7 +370,7 @@ class IepInteractiveHelp(QtGui.QWidget):
                         h_text = docs
                 
                 # Parse the text as rest/numpy like docstring  
-                h_text = self.smartFormat(h_text)
+                h_text = cls.smartFormat(h_text)
                 if header:
                     h_text = "<p style='color:#005;'><b>%s</b></p>\n%s" % (
                                                             header, h_text)
@@ -273,6 +382,7 @@ class IepInteractiveHelp(QtGui.QWidget):
             # Compile rich text
             text += get_title_text(objectName, h_class, h_repr)
             text += '{}<br />'.format(h_text)
+            return objectName, text
         
         except Exception as why:
             try:
@@ -280,29 +390,28 @@ class IepInteractiveHelp(QtGui.QWidget):
                 text += h_text
             except Exception:
                 text = response
-        
-        # Done
-        size = self._config.fontSize
-        self.setText(text)
+            return None, text
     
     
-    def smartFormat(self, text):
+    @staticmethod
+    def smartFormat(text):
         
         # Get lines
         lines = text.splitlines()
         
-        # Test minimal indentation
-        minIndent = 9999
-        for line in lines[1:]:
-            line_ = line.lstrip()
-            indent = len(line) - len(line_)
-            if line_:
-                minIndent = min(minIndent, indent)
+        # Short-cut for a single line without any markup, which is the
+        # common case for builtins and attributes
+        if len(lines) == 1:
+            line_ = lines[0].lstrip()
+            m = _lineRe.match(lines[0])
+            if not (m.group('header') or m.group('rest') is not None or 
+                    line_.startswith('* ')):
+                return line_ or "<br />"
         
-        # Remove minimal indentation
-        lines2 = [lines[0]]
-        for line in lines[1:]:            
-            lines2.append( line[minIndent:] )
+        # Test minimal indentation (the first line does not count)
+        indents = [len(line) - len(line.lstrip()) 
+                    for line in lines[1:] if line.strip()]
+        minIndent = min(indents) if indents else 0
         
         # Prepare        
         prevLine_ = ''
@@ -311,30 +420,34 @@ class IepInteractiveHelp(QtGui.QWidget):
         inExample = False
         forceNewline = False
         
-        # Format line by line
-        lines3 = []
-        for line in lines2:
-            
+        # Format line by line, removing the minimal indentation
+        lines2 = []
+        for i, line in enumerate(lines):
+            if i:
+                line = line[minIndent:]
             
             # Get indentation
             line_ = line.lstrip()
             indent = len(line) - len(line_)
-            #indentPart = line[:indent-minIndent]
-            indentPart = line[:indent]
             
             if not line_:
-                lines3.append("<br />")
+                lines2.append("<br />")
                 forceNewline = True
                 continue
             
             # Indent in html
-            line = "&nbsp;" * len(indentPart) + line
+            if indent < len(_nbspCache):
+                indentHtml = _nbspCache[indent]
+            else:
+                indentHtml = "&nbsp;" * indent
             
             # Determine if we should introduce a newline
+            m = _lineRe.match(line)
             isHeader = False
-            if ("---" in line or "===" in line) and indent == prevIndent:
+            isKeyValue = False
+            if m.group('header') and indent == prevIndent:
                 # Header
-                lines3[-1] = '<b>' + lines3[-1] + '</b>'
+                lines2[-1] = '<b>' + lines2[-1] + '</b>'
                 line = ''#'<br /> ' + line
                 isHeader = True
                 inExample = False
@@ -343,13 +456,14 @@ class IepInteractiveHelp(QtGui.QWidget):
                     inExample = True
                 else:
                     inExample = False
-            elif ' : ' in line:
-                tmp = line.split(' : ',1)
-                line = '<br /><u>' + tmp[0] + '</u> : ' + tmp[1]
+            elif m.group('rest') is not None:
+                line = '<br /><u>%s%s</u> : %s' % (indentHtml, 
+                                            m.group('key'), m.group('rest'))
+                isKeyValue = True
             elif line_.startswith('* '):
                 line = '<br />&nbsp;&nbsp;&nbsp;&#8226;' + line_[2:]
             elif prevWasHeader or inExample or forceNewline:
-                line = '<br />' + line
+                line = '<br />' + indentHtml + line
             else:
                 if prevLine_:
                     line = " " + line_
@@ -357,10 +471,7 @@ class IepInteractiveHelp(QtGui.QWidget):
                     line = line_
             
             # Force next line to be on a new line if using a colon
-            if ' : ' in line:
-                forceNewline = True
-            else:
-                forceNewline = False
+            forceNewline = isKeyValue
             
             # Prepare for next line
             prevLine_ = line_
@@ -368,8 +479,8 @@ class IepInteractiveHelp(QtGui.QWidget):
             prevWasHeader = isHeader
             
             # Done with line
-            lines3.append(line)
+            lines2.append(line)
         
         # Done formatting
-        return ''.join(lines3)
+        return ''.join(lines2)
     
@@ -57,6 +57,9 @@ def getLocale(languageName):
         return QtCore.QLocale(qtLanguage)
 
 
+# Buffer for the translators that were loaded, per (what, localeName)
+_loadedTranslators = {}
+
 def setLanguage(languageName):
     """ setLanguage(languageName)
     Set the language for the app. Loads qt and iep translations.
@@ -81,6 +84,10 @@ def setLanguage(languageName):
         QtCore._translators = []
     for trans in QtCore._translators:
         QtGui.QApplication.removeTranslator(trans)
+    QtCore._translators = []
+    
+    # The buffered translations are no longer valid
+    _translations.clear()
     
     # The default language     
     if localeName1 == 'C':
@@ -89,11 +96,18 @@ def setLanguage(languageName):
     # Set Qt translations
     # Note that the translator instances must be stored
     # Note that the load() method is very forgiving with the file name
+    # Loaded translators are kept, so that each file is read only once
     for what, where in [('qt', qtTransPath),('iep', iepTransPath)]:
-        trans = QtCore.QTranslator()
         # Try loading both names
         for localeName in [localeName1, localeName2]:
-            success = trans.load(what + '_' + localeName + '.tr', where)
+            trans = _loadedTranslators.get((what, localeName), None)
+            if trans is None:
+                trans = QtCore.QTranslator()
+                success = trans.load(what + '_' + localeName + '.tr', where)
+                if success:
+                    _loadedTranslators[(what, localeName)] = trans
+            else:
+                success = True
             if success:
                 QtGui.QApplication.installTranslator(trans)
                 QtCore._translators.append(trans)
@@ -123,21 +137,28 @@ class Translation(str):
     use this feature or do not know about this feature, everything
     keeps working as expected.
     """
-    pass
+    __slots__ = ('original', 'tt', 'key') # No __dict__ per instance
 
 
 def _splitMainAndTt(s):
-        if ':::' in s:
-            parts = s.split(':::', 1)
-            return parts[0].rstrip(), parts[1].lstrip()
-        else:
-            return s, ''
+    main, sep, tt = s.partition(':::')
+    if sep:
+        return main.rstrip(), tt.lstrip()
+    else:
+        return s, ''
+
 
+# Buffer for the translations, cleared when the language is set
+_translations = {}
 
 def translate(context, text, disambiguation=None):  
     """ translate(context, text, disambiguation=None)
     The translate function used throughout IEP.
     """
+    # Use buffered translation if we can
+    bufferKey = context, text, disambiguation
+    if bufferKey in _translations:
+        return _translations[bufferKey]
     # Get translation and split tooltip
     newtext = QtCore.QCoreApplication.translate(context, text, disambiguation)
     s, tt = _splitMainAndTt(newtext)
@@ -146,6 +167,7 @@ def translate(context, text, disambiguation=None):
     translation.original = text
     translation.tt = tt
     translation.key = _splitMainAndTt(text)[0].strip()
+    _translations[bufferKey] = translation
     return translation
 
 